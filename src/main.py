@@ -5,12 +5,16 @@ import json
 import shutil
 import asyncio
 import threading
+import multiprocessing
 
-from modules.file_manager import extract_vmdlc_from_dir, extract_vmdl_from_dir, copy_files_with_index, extract_addons
+from modules.file_manager import extract_vmdlc_from_dir, extract_vmdl_from_dir, copy_files_with_index, staged_output_names, extract_addons
 from modules.vrf_handler import decomp_vmdl_cs
 from modules.vmdl_handler import construct_objs_from_vmdls
+from modules.watcher import watch_vmdlcs
 
 selected_models = []
+pending_exports = set()
+app_state = {"running": False, "watch_stop": None, "watch_dir": None}
 
 def log(message):
     console.insert(tk.END, message + '\n')
@@ -76,6 +80,22 @@ def build_model_selector(model_paths):
         selected_models.append((path, var))
 
 def export_selected():
+    output_dir = output_entry.get()
+    if not selected_models or not output_dir or not selected_addon_path.get():
+        log("[ERROR] Missing input.")
+        return
+    selected_paths = [path for path, var in selected_models if var.get()]
+    queue_export(selected_paths)
+
+def queue_export(paths):
+    # Exports share a temp folder, so changes arriving mid-export wait for the current one to finish
+    pending_exports.update(paths)
+    if not app_state["running"] and pending_exports:
+        paths = sorted(pending_exports)
+        pending_exports.clear()
+        start_export(paths)
+
+def start_export(paths):
     output_dir = output_entry.get()
     threshold = float(thresh_var.get())
     use_physics = physics_var.get()
@@ -83,34 +103,86 @@ def export_selected():
     use_combined = combined_var.get()
     snap_enabled = snap_var.get()
     snap_size = snap_size_var.get() if snap_enabled else None
+    tile_enabled = tile_var.get()
+    tile_size = tile_size_var.get() if tile_enabled else None
 
-    if not selected_models or not output_dir or not selected_addon_path.get():
-        log("[ERROR] Missing input.")
-        return
+    addon_dir = selected_addon_path.get()
+    output_names = staged_output_names(paths, addon_dir)
+
+    app_state["running"] = True
     disable(exportButton)
     temp_dir = os.path.join(output_dir, '_VMDL_EXTRACTOR_temp')
-    if os.path.exists(temp_dir):
-        shutil.rmtree(temp_dir)
-    os.makedirs(temp_dir)
 
-    selected_paths = [path for path, var in selected_models if var.get()]
-    copy_files_with_index(log, selected_paths, temp_dir)
-    decomp_vmdl_cs(log, temp_dir, temp_dir)
+    # Staging and decompiling block, so they run on the worker thread to keep the GUI responsive
+    async def export():
+        if os.path.exists(temp_dir):
+            shutil.rmtree(temp_dir)
+        os.makedirs(temp_dir)
+
+        copy_files_with_index(log, paths, temp_dir, link=True)
+        decomp_vmdl_cs(log, temp_dir, temp_dir)
+
+        vmdls = extract_vmdl_from_dir(log, temp_dir)
+        await construct_objs_from_vmdls(on_complete, log, vmdls, temp_dir, output_dir, threshold,
+                                        use_physics, use_render, use_combined, snap_enabled=snap_enabled, snap_size=snap_size,
+                                        tile_enabled=tile_enabled, tile_size=tile_size, output_names=output_names)
 
-    vmdls = extract_vmdl_from_dir(log, temp_dir)
-    run_async_in_thread(
-    construct_objs_from_vmdls(on_complete, log, vmdls, temp_dir, output_dir, threshold,
-                              use_physics, use_render, use_combined, snap_enabled=snap_enabled, snap_size=snap_size)
-    )
+    run_async_in_thread(export(), lambda: cleanup_export(temp_dir))
 
 def on_complete(temp_dir):
-    shutil.rmtree(temp_dir)
-    enable(exportButton)
     log('\n\n - - - All conversions completed - - - \n\n')
-    
-def run_async_in_thread(coro):
+
+def cleanup_export(temp_dir):
+    # Always runs, even if the export failed, so later exports and watch mode aren't left queued forever
+    shutil.rmtree(temp_dir, ignore_errors=True)
+    root.after(0, finish_export)
+
+def finish_export():
+    app_state["running"] = False
+    enable(exportButton)
+    queue_export([])
+
+def start_watch():
+    addon_dir = selected_addon_path.get()
+    if not addon_dir or not output_entry.get():
+        log("[ERROR] Select an addon and output directory before watching.")
+        watch_var.set(False)
+        return
+    stop_event = threading.Event()
+    app_state["watch_stop"] = stop_event
+    app_state["watch_dir"] = addon_dir
+    threading.Thread(target=watch_vmdlcs, args=(log, addon_dir, on_watch_changes, stop_event), daemon=True).start()
+
+def stop_watch():
+    if app_state["watch_stop"]:
+        app_state["watch_stop"].set()
+        app_state["watch_stop"] = None
+        app_state["watch_dir"] = None
+
+def toggle_watch():
+    if watch_var.get():
+        start_watch()
+    else:
+        stop_watch()
+
+def on_addon_changed(*_):
+    # Follow the selected addon while watching instead of silently watching the old one
+    if app_state["watch_stop"] and selected_addon_path.get() != app_state["watch_dir"]:
+        stop_watch()
+        start_watch()
+
+def on_watch_changes(paths):
+    # Called from the watcher thread, hand the export over to the Tk thread
+    root.after(0, lambda: queue_export(paths))
+
+def run_async_in_thread(coro, on_finish):
     def runner():
-        asyncio.run(coro)
+        try:
+            asyncio.run(coro)
+        except Exception as e:
+            log(f"[ERROR] Export failed: {e}")
+        finally:
+            on_finish()
     threading.Thread(target=runner).start()
 
 def on_mousewheel_context(event):
@@ -125,139 +197,157 @@ def bind_scroll_area(canvas, tag):
     canvas.bind("<Enter>", lambda e: hover_target.set(tag))
     canvas.bind("<Leave>", lambda e: hover_target.set("main"))
 
-# === TK Window Setup ===
-root = tk.Tk()
-root.title("VMDL Ramp Extractor")
-root.geometry("1200x800")
-
-hover_target = tk.StringVar(value="main") 
-selected_addon_path = tk.StringVar()
-settings = {}
-
-# Load settings if available
-if os.path.exists("settings.json"):
-    try:
-        with open("settings.json") as f:
-            settings = json.load(f)
-    except Exception as e:
-        print(f"[ERROR] Failed to load settings.json: {e}")
-
-# === Main Horizontal Layout ===
-content_frame = ttk.Frame(root)
-content_frame.pack(fill="both", expand=True)
-
-# === Left UI Panel (Canvas with Scrollbar) ===
-main_canvas = tk.Canvas(content_frame)
-main_scrollbar = ttk.Scrollbar(content_frame, orient="vertical", command=main_canvas.yview)
-main_canvas.configure(yscrollcommand=main_scrollbar.set)
-
-main_scrollbar.pack(side="right", fill="y")
-main_canvas.pack(side="left", fill="both", expand=True)
-
-main_frame = ttk.Frame(main_canvas)
-main_canvas.create_window((0, 0), window=main_frame, anchor="nw", tags="main_frame_window")
-main_canvas.bind("<Configure>", lambda e: main_canvas.itemconfig("main_frame_window", width=e.width))
-main_frame.bind("<Configure>", lambda e: main_canvas.configure(scrollregion=main_canvas.bbox("all")))
-
-# === GUI Elements ===
-ttk.Label(main_frame, text="Base Game Directory:").pack(anchor='w')
-base_dir_entry = ttk.Entry(main_frame, width=80)
-base_dir_entry.pack()
-if "game_install_directory" in settings:
-    base_dir_entry.insert(0, settings["game_install_directory"])
-ttk.Button(main_frame, text="Browse", command=lambda: browse_base_game_dir(base_dir_entry)).pack()
-
-ttk.Label(main_frame, text="Output Directory:").pack(anchor='w', pady=(10, 0))
-output_entry = ttk.Entry(main_frame, width=80)
-output_entry.pack()
-ttk.Button(main_frame, text="Browse", command=lambda: browse_output(output_entry)).pack()
-
-ttk.Button(main_frame, text="Refresh Addons", command=refresh_addons).pack(pady=5)
-
-# === Addons Section ===
-addon_group = ttk.LabelFrame(main_frame, text="Available Addons", padding=(10, 5))
-addon_group.pack(fill=tk.X, pady=(10, 0))
-
-addon_container = ttk.Frame(addon_group, height=150)
-addon_container.pack(fill=tk.X, pady=5)
-addon_canvas = tk.Canvas(addon_container, height=150)
-addon_scroll = ttk.Scrollbar(addon_container, orient="vertical", command=addon_canvas.yview)
-addon_canvas.configure(yscrollcommand=addon_scroll.set)
-
-addon_scroll.pack(side="right", fill="y")
-addon_canvas.pack(side="left", fill="both", expand=True)
-addon_frame = ttk.Frame(addon_canvas)
-addon_canvas.create_window((0, 0), window=addon_frame, anchor='nw')
-addon_frame.bind("<Configure>", lambda e: addon_canvas.configure(scrollregion=addon_canvas.bbox("all")))
-
-ttk.Button(main_frame, text="Select Addon", command=select_addon).pack(pady=5)
-
-# === Model Selector ===
-model_group = ttk.LabelFrame(main_frame, text="Select Models to Export", padding=(10, 5))
-model_group.pack(fill=tk.X, pady=(10, 0))
-
-model_container = ttk.Frame(model_group, height=200)
-model_container.pack(fill=tk.X, pady=5)
-model_canvas = tk.Canvas(model_container, height=200)
-model_scroll = ttk.Scrollbar(model_container, orient="vertical", command=model_canvas.yview)
-model_canvas.configure(yscrollcommand=model_scroll.set)
-
-model_scroll.pack(side="right", fill="y")
-model_canvas.pack(side="left", fill="both", expand=True)
-model_frame = ttk.Frame(model_canvas)
-model_canvas.create_window((0, 0), window=model_frame, anchor='nw')
-model_frame.bind("<Configure>", lambda e: model_canvas.configure(scrollregion=model_canvas.bbox("all")))
-
-# === Export Settings Section ===
-options_group = ttk.LabelFrame(main_frame, text="Export Options", padding=(10, 10))
-options_group.pack(fill=tk.X, pady=(15, 0))
-
-# === Snap to Grid Option ===
-snap_frame = ttk.Frame(options_group)
-snap_frame.pack(anchor='w', pady=(0, 10))
-
-snap_var = tk.BooleanVar(value=False)
-ttk.Checkbutton(snap_frame, text="Snap Vertices to Grid", variable=snap_var).pack(side="left", padx=(0, 10))
-
-snap_values = [0.0625, 0.125, 0.250, 0.500, 1.000]
-snap_size_var = tk.DoubleVar(value=snap_values[0])
-ttk.OptionMenu(snap_frame, snap_size_var, snap_values[0], *snap_values).pack(side="left")
-
-checkbox_frame = ttk.Frame(options_group)
-checkbox_frame.pack(anchor='w', pady=(0, 10))
-
-physics_var = tk.BooleanVar(value=settings.get("export_physics", False))
-render_var = tk.BooleanVar(value=settings.get("export_render", False))
-combined_var = tk.BooleanVar(value=settings.get("export_combined", True))
-
-ttk.Checkbutton(checkbox_frame, text="Export Physics", variable=physics_var).pack(side="left", padx=5)
-ttk.Checkbutton(checkbox_frame, text="Export Render", variable=render_var).pack(side="left", padx=5)
-ttk.Checkbutton(checkbox_frame, text="Export Combined", variable=combined_var).pack(side="left", padx=5)
-
-ttk.Label(options_group, text="Vertex Coplane Threshold (0.0 - 1.0):").pack(anchor='w')
-thresh_var = tk.DoubleVar(value=0.99)
-thresh_frame = ttk.Frame(options_group)
-thresh_frame.pack(fill='x')
-ttk.Scale(thresh_frame, from_=0.0, to=1.0, orient=tk.HORIZONTAL, variable=thresh_var).pack(side='left', fill='x', expand=True)
-ttk.Entry(thresh_frame, textvariable=thresh_var, width=5).pack(side='right')
-
-# === EXPORT BUTTON ===
-exportButton = ttk.Button(main_frame, text="Convert Models", command=export_selected)
-exportButton.pack(pady=10)
-result_label = ttk.Label(main_frame, text="")
-result_label.pack()
-
-# === Console Output ===
-console_frame = ttk.Frame(content_frame, width=400)
-console_frame.pack(side="right", fill="y")
-ttk.Label(console_frame, text="Console Output:").pack(anchor='nw', padx=5, pady=(10, 0))
-console = tk.Text(console_frame, width=50)
-console.pack(fill="both", expand=True, padx=5, pady=5)
-
-# === Scroll Context ===
-main_canvas.bind_all("<MouseWheel>", on_mousewheel_context)
-bind_scroll_area(addon_canvas, "addons")
-bind_scroll_area(model_canvas, "models")
-
-refresh_addons()
-root.mainloop()
+if __name__ == '__main__':
+    # Tiled cleaning spawns worker processes, which re-import this file on Windows
+    multiprocessing.freeze_support()
+
+    # === TK Window Setup ===
+    root = tk.Tk()
+    root.title("VMDL Ramp Extractor")
+    root.geometry("1200x800")
+
+    hover_target = tk.StringVar(value="main") 
+    selected_addon_path = tk.StringVar()
+    settings = {}
+
+    # Load settings if available
+    if os.path.exists("settings.json"):
+        try:
+            with open("settings.json") as f:
+                settings = json.load(f)
+        except Exception as e:
+            print(f"[ERROR] Failed to load settings.json: {e}")
+
+    # === Main Horizontal Layout ===
+    content_frame = ttk.Frame(root)
+    content_frame.pack(fill="both", expand=True)
+
+    # === Left UI Panel (Canvas with Scrollbar) ===
+    main_canvas = tk.Canvas(content_frame)
+    main_scrollbar = ttk.Scrollbar(content_frame, orient="vertical", command=main_canvas.yview)
+    main_canvas.configure(yscrollcommand=main_scrollbar.set)
+
+    main_scrollbar.pack(side="right", fill="y")
+    main_canvas.pack(side="left", fill="both", expand=True)
+
+    main_frame = ttk.Frame(main_canvas)
+    main_canvas.create_window((0, 0), window=main_frame, anchor="nw", tags="main_frame_window")
+    main_canvas.bind("<Configure>", lambda e: main_canvas.itemconfig("main_frame_window", width=e.width))
+    main_frame.bind("<Configure>", lambda e: main_canvas.configure(scrollregion=main_canvas.bbox("all")))
+
+    # === GUI Elements ===
+    ttk.Label(main_frame, text="Base Game Directory:").pack(anchor='w')
+    base_dir_entry = ttk.Entry(main_frame, width=80)
+    base_dir_entry.pack()
+    if "game_install_directory" in settings:
+        base_dir_entry.insert(0, settings["game_install_directory"])
+    ttk.Button(main_frame, text="Browse", command=lambda: browse_base_game_dir(base_dir_entry)).pack()
+
+    ttk.Label(main_frame, text="Output Directory:").pack(anchor='w', pady=(10, 0))
+    output_entry = ttk.Entry(main_frame, width=80)
+    output_entry.pack()
+    ttk.Button(main_frame, text="Browse", command=lambda: browse_output(output_entry)).pack()
+
+    ttk.Button(main_frame, text="Refresh Addons", command=refresh_addons).pack(pady=5)
+
+    # === Addons Section ===
+    addon_group = ttk.LabelFrame(main_frame, text="Available Addons", padding=(10, 5))
+    addon_group.pack(fill=tk.X, pady=(10, 0))
+
+    addon_container = ttk.Frame(addon_group, height=150)
+    addon_container.pack(fill=tk.X, pady=5)
+    addon_canvas = tk.Canvas(addon_container, height=150)
+    addon_scroll = ttk.Scrollbar(addon_container, orient="vertical", command=addon_canvas.yview)
+    addon_canvas.configure(yscrollcommand=addon_scroll.set)
+
+    addon_scroll.pack(side="right", fill="y")
+    addon_canvas.pack(side="left", fill="both", expand=True)
+    addon_frame = ttk.Frame(addon_canvas)
+    addon_canvas.create_window((0, 0), window=addon_frame, anchor='nw')
+    addon_frame.bind("<Configure>", lambda e: addon_canvas.configure(scrollregion=addon_canvas.bbox("all")))
+
+    ttk.Button(main_frame, text="Select Addon", command=select_addon).pack(pady=5)
+
+    # === Model Selector ===
+    model_group = ttk.LabelFrame(main_frame, text="Select Models to Export", padding=(10, 5))
+    model_group.pack(fill=tk.X, pady=(10, 0))
+
+    model_container = ttk.Frame(model_group, height=200)
+    model_container.pack(fill=tk.X, pady=5)
+    model_canvas = tk.Canvas(model_container, height=200)
+    model_scroll = ttk.Scrollbar(model_container, orient="vertical", command=model_canvas.yview)
+    model_canvas.configure(yscrollcommand=model_scroll.set)
+
+    model_scroll.pack(side="right", fill="y")
+    model_canvas.pack(side="left", fill="both", expand=True)
+    model_frame = ttk.Frame(model_canvas)
+    model_canvas.create_window((0, 0), window=model_frame, anchor='nw')
+    model_frame.bind("<Configure>", lambda e: model_canvas.configure(scrollregion=model_canvas.bbox("all")))
+
+    # === Export Settings Section ===
+    options_group = ttk.LabelFrame(main_frame, text="Export Options", padding=(10, 10))
+    options_group.pack(fill=tk.X, pady=(15, 0))
+
+    # === Snap to Grid Option ===
+    snap_frame = ttk.Frame(options_group)
+    snap_frame.pack(anchor='w', pady=(0, 10))
+
+    snap_var = tk.BooleanVar(value=False)
+    ttk.Checkbutton(snap_frame, text="Snap Vertices to Grid", variable=snap_var).pack(side="left", padx=(0, 10))
+
+    snap_values = [0.0625, 0.125, 0.250, 0.500, 1.000]
+    snap_size_var = tk.DoubleVar(value=snap_values[0])
+    ttk.OptionMenu(snap_frame, snap_size_var, snap_values[0], *snap_values).pack(side="left")
+
+    # === Tiled Cleaning Option ===
+    tile_frame = ttk.Frame(options_group)
+    tile_frame.pack(anchor='w', pady=(0, 10))
+
+    tile_var = tk.BooleanVar(value=False)
+    ttk.Checkbutton(tile_frame, text="Tiled Parallel Cleaning (large maps)", variable=tile_var).pack(side="left", padx=(0, 10))
+
+    tile_values = [256.0, 512.0, 1024.0, 2048.0, 4096.0]
+    tile_size_var = tk.DoubleVar(value=tile_values[2])
+    ttk.OptionMenu(tile_frame, tile_size_var, tile_values[2], *tile_values).pack(side="left")
+
+    checkbox_frame = ttk.Frame(options_group)
+    checkbox_frame.pack(anchor='w', pady=(0, 10))
+
+    physics_var = tk.BooleanVar(value=settings.get("export_physics", False))
+    render_var = tk.BooleanVar(value=settings.get("export_render", False))
+    combined_var = tk.BooleanVar(value=settings.get("export_combined", True))
+
+    ttk.Checkbutton(checkbox_frame, text="Export Physics", variable=physics_var).pack(side="left", padx=5)
+    ttk.Checkbutton(checkbox_frame, text="Export Render", variable=render_var).pack(side="left", padx=5)
+    ttk.Checkbutton(checkbox_frame, text="Export Combined", variable=combined_var).pack(side="left", padx=5)
+
+    ttk.Label(options_group, text="Vertex Coplane Threshold (0.0 - 1.0):").pack(anchor='w')
+    thresh_var = tk.DoubleVar(value=0.99)
+    thresh_frame = ttk.Frame(options_group)
+    thresh_frame.pack(fill='x')
+    ttk.Scale(thresh_frame, from_=0.0, to=1.0, orient=tk.HORIZONTAL, variable=thresh_var).pack(side='left', fill='x', expand=True)
+    ttk.Entry(thresh_frame, textvariable=thresh_var, width=5).pack(side='right')
+
+    # === EXPORT BUTTON ===
+    exportButton = ttk.Button(main_frame, text="Convert Models", command=export_selected)
+    exportButton.pack(pady=10)
+    watch_var = tk.BooleanVar(value=False)
+    ttk.Checkbutton(main_frame, text="Watch Addon (re-export recompiled models)", variable=watch_var, command=toggle_watch).pack()
+    selected_addon_path.trace_add("write", on_addon_changed)
+    result_label = ttk.Label(main_frame, text="")
+    result_label.pack()
+
+    # === Console Output ===
+    console_frame = ttk.Frame(content_frame, width=400)
+    console_frame.pack(side="right", fill="y")
+    ttk.Label(console_frame, text="Console Output:").pack(anchor='nw', padx=5, pady=(10, 0))
+    console = tk.Text(console_frame, width=50)
+    console.pack(fill="both", expand=True, padx=5, pady=5)
+
+    # === Scroll Context ===
+    main_canvas.bind_all("<MouseWheel>", on_mousewheel_context)
+    bind_scroll_area(addon_canvas, "addons")
+    bind_scroll_area(model_canvas, "models")
+
+    refresh_addons()
+    root.mainloop()
@@ -1,6 +1,7 @@
 import os
 import glob
 import shutil
+import hashlib
 
 def extract_addons(log, game_dir):
     compiled_addons_dir = os.path.join(game_dir, 'game\csgo_addons')
@@ -46,19 +47,67 @@ def extract_gltf_from_dir(log, dir_path):
 
     return gltf_files
 
-def copy_files_with_index(log, filepaths, output_dir):
+def link_file(source, dest):
+    # Hardlink first (transparent to the decompiler), then symlink, then fall back to a real copy
+    try:
+        os.link(source, dest)
+        return 'hardlink'
+    except (OSError, NotImplementedError):
+        pass
+    try:
+        os.symlink(os.path.abspath(source), dest)
+        return 'symlink'
+    except (OSError, NotImplementedError):
+        pass
+    shutil.copy2(source, dest)
+    return 'copy'
+
+def indexed_filename(index, file_path):
+    return f"{index}_{os.path.basename(file_path)}"
+
+def copy_files_with_index(log, filepaths, output_dir, link=False):
     new_filepaths = []
+    counts = {'hardlink': 0, 'symlink': 0, 'copy': 0}
     for index, file_path in enumerate(filepaths):
         if not os.path.isfile(file_path):
             log(f'Skipping .vmdl_c fp: {file_path} is not a file.')
             continue  # Skip if it's not a file
-        filename = os.path.basename(file_path)
-        new_filename = f"{index}_{filename}"
-        dest_path = os.path.join(output_dir, new_filename)
+        dest_path = os.path.join(output_dir, indexed_filename(index, file_path))
         new_filepaths.append(dest_path)
-        shutil.copy2(file_path, dest_path)
+        if link:
+            counts[link_file(file_path, dest_path)] += 1
+        else:
+            shutil.copy2(file_path, dest_path)
+            counts['copy'] += 1
+    if link:
+        log(f'Staged {len(new_filepaths)} .vmdl_c files.' +
+            f'\n    Hardlinked: {counts["hardlink"]}' +
+            f'\n    Symlinked: {counts["symlink"]}' +
+            f'\n    Copied: {counts["copy"]}')
+    else:
+        log(f'Copied {len(new_filepaths)} .vmdl_c files.')
     return new_filepaths
 
+def model_output_name(source_path, addon_dir):
+    # Named after the model's path inside the addon, so models sharing a filename in
+    # different folders never overwrite each other and every export of a model hits the same OBJ
+    rel_path = os.path.relpath(source_path, addon_dir)
+    if rel_path.startswith('..'):
+        rel_path = os.path.basename(source_path)
+    return os.path.splitext(rel_path)[0].replace('\\', '_').replace('/', '_')
+
+def staged_output_names(filepaths, addon_dir):
+    # Maps each staged model name, as written by copy_files_with_index, to its output name
+    return {indexed_filename(index, file_path).split('.')[0]: model_output_name(file_path, addon_dir)
+            for index, file_path in enumerate(filepaths)}
+
+def hash_file(path, chunk_size=1 << 20):
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
 def write_obj(log, data, base_path, basename, suffix=""):
     filepath = os.path.join(base_path, basename + suffix + '.obj')
     log(f'Writing obj file: {basename + suffix + ".obj"}')
@@ -1,4 +1,7 @@
+import os
 import numpy as np
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from shapely.geometry import Polygon
 from modules.obj_utils import generate_obj_text, extract_mesh
 
@@ -31,6 +34,8 @@ def merge_triangles(log, vertices, faces, threshold=0.99):
             if j in used:
                 continue
             f2 = faces[j]
+            if len(f2) != 3:
+                continue  # only triangle pairs can be merged
             shared = share_edge(f1, f2)
             if len(shared) != 2:
                 continue  # not an adjacent triangle
@@ -143,12 +148,207 @@ def remove_duplicate_faces(log, vertices, faces):
 def snap_vertex(vertex, snap_size=0.0625):
     return tuple(snap_size * round(val / snap_size) for val in vertex)
 
+def clean_faces(log, vertices, faces):
+    faces_clean = remove_subfaces(vertices, faces)
+    return remove_duplicate_faces(log, vertices, faces_clean)
+
 def clean_mesh(log, content):
     vertices, faces = extract_mesh(content)
-    faces_clean = remove_subfaces(vertices, faces)
-    unique_faces = remove_duplicate_faces(log, vertices, faces_clean)
+    unique_faces = clean_faces(log, vertices, faces)
     return generate_obj_text(vertices, unique_faces)
 
+def face_cell_range(vertices, face, tile_size):
+    points = vertices[face]
+    lo = tuple(int(c) for c in np.floor(points.min(axis=0) / tile_size))
+    hi = tuple(int(c) for c in np.floor(points.max(axis=0) / tile_size))
+    return lo, hi
+
+def split_into_tiles(vertices, faces, tile_size):
+    # Faces whose bounding box stays inside one cell belong to that tile,
+    # anything touching or crossing a cell border is held back as a seam face
+    tiles = {}
+    seam = []
+    for i, face in enumerate(faces):
+        lo, hi = face_cell_range(vertices, face, tile_size)
+        if lo == hi:
+            tiles.setdefault(lo, []).append(i)
+        else:
+            seam.append(i)
+    return tiles, seam
+
+def localise_faces(vertices, faces):
+    # Compact a subset of faces so a worker only receives the vertices it uses
+    global_indices = []
+    index_map = {}
+    local_faces = []
+    for face in faces:
+        local_face = []
+        for idx in face:
+            if idx not in index_map:
+                index_map[idx] = len(global_indices)
+                global_indices.append(idx)
+            local_face.append(index_map[idx])
+        local_faces.append(local_face)
+    return vertices[global_indices], local_faces, global_indices
+
+def merge_and_clean_faces(vertices, faces, threshold):
+    # Runs in worker processes, so the GUI log callback cannot be used here
+    quiet = lambda _: None
+    merged = merge_triangles(quiet, vertices, faces, threshold)
+    return clean_faces(quiet, vertices, merged)
+
+def tile_job(vertices, faces, threshold):
+    local_vertices, local_faces, global_indices = localise_faces(vertices, faces)
+    return local_vertices, local_faces, global_indices, threshold
+
+def process_tile(job):
+    vertices, faces, global_indices, threshold = job
+    cleaned = merge_and_clean_faces(vertices, faces, threshold)
+    return [[global_indices[i] for i in face] for face in cleaned]
+
+def map_bounded(executor, fn, jobs, max_in_flight):
+    # Like executor.map, but jobs are only built and submitted as earlier ones finish,
+    # so at most max_in_flight tiles are held in memory waiting for a worker
+    in_flight = deque()
+    for job in jobs:
+        in_flight.append(executor.submit(fn, job))
+        if len(in_flight) >= max_in_flight:
+            yield in_flight.popleft().result()
+    while in_flight:
+        yield in_flight.popleft().result()
+
+def bbox_within(inner, outer):
+    return np.all(inner[0] >= outer[0]) and np.all(inner[1] <= outer[1])
+
+def triangle_edges(face):
+    return [tuple(sorted((face[i], face[(i + 1) % 3]))) for i in range(3)]
+
+def find_root(parent, i):
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+def group_seam_faces(vertices, seam_faces, tile_faces, tile_size, threshold):
+    # Splits the seam faces into independent groups, pulling in only the tile faces
+    # they can actually interact with: triangles sharing an edge whose normals pass the
+    # merge threshold, and coplanar faces inside their bounding box (possible subfaces).
+    # Faces in different groups cannot affect each other, so groups are cleaned separately.
+    pass_faces = list(seam_faces)
+    parent = list(range(len(pass_faces)))
+
+    def union(a, b):
+        parent[find_root(parent, a)] = find_root(parent, b)
+
+    normals = {}
+    seam_edges = {}
+    for p, face in enumerate(seam_faces):
+        if len(face) == 3:
+            normals[p] = face_normal(*vertices[face])
+            for edge in triangle_edges(face):
+                seam_edges.setdefault(edge, []).append(p)
+    for shared in seam_edges.values():
+        for i in range(len(shared)):
+            for j in range(i + 1, len(shared)):
+                if np.dot(normals[shared[i]], normals[shared[j]]) >= threshold:
+                    union(shared[i], shared[j])
+
+    duplicates = {}
+    for p, face in enumerate(seam_faces):
+        key = tuple(sorted(face))
+        if key in duplicates:
+            union(duplicates[key], p)
+        else:
+            duplicates[key] = p
+
+    seam_cells = {}
+    for p, face in enumerate(seam_faces):
+        if len(face) < 3:
+            continue
+        points = vertices[face]
+        box = (points.min(axis=0), points.max(axis=0))
+        lo, hi = face_cell_range(vertices, face, tile_size)
+        for cell in np.ndindex(*(h - l + 1 for l, h in zip(lo, hi))):
+            seam_cells.setdefault(tuple(l + c for l, c in zip(lo, cell)), []).append((p, box))
+
+    def containers(face):
+        if len(face) < 3:
+            return []
+        points = vertices[face]
+        box = (points.min(axis=0), points.max(axis=0))
+        found = []
+        for p, seam_box in seam_cells.get(face_cell_range(vertices, face, tile_size)[0], []):
+            a_verts = vertices[seam_faces[p]]
+            if bbox_within(box, seam_box) and all(are_coplanar(a_verts[0], a_verts[1], a_verts[2], v) for v in points):
+                found.append(p)
+        return found
+
+    for p, face in enumerate(seam_faces):
+        for q in containers(face):
+            if q != p:
+                union(p, q)
+
+    rest = []
+    for face in tile_faces:
+        linked = containers(face)
+        if len(face) == 3:
+            normal = None
+            for edge in triangle_edges(face):
+                for p in seam_edges.get(edge, []):
+                    if normal is None:
+                        normal = face_normal(*vertices[face])
+                    if np.dot(normal, normals[p]) >= threshold:
+                        linked.append(p)
+        if not linked:
+            rest.append(face)
+            continue
+        q = len(pass_faces)
+        pass_faces.append(face)
+        parent.append(q)
+        for p in linked:
+            union(p, q)
+
+    groups = {}
+    for i, face in enumerate(pass_faces):
+        groups.setdefault(find_root(parent, i), []).append(face)
+    return list(groups.values()), rest
+
+def merge_and_clean_tiled(log, obj_text, threshold=0.99, tile_size=1024.0, executor=None, max_in_flight=None):
+    # The parent still holds the whole combined mesh; workers only ever see one tile or seam group
+    if executor is None:
+        with ProcessPoolExecutor() as executor:
+            return merge_and_clean_tiled(log, obj_text, threshold, tile_size, executor, max_in_flight)
+    if max_in_flight is None:
+        max_in_flight = 2 * (os.cpu_count() or 1)
+
+    vertices, faces = extract_mesh(obj_text)
+    tiles, seam = split_into_tiles(vertices, faces, tile_size)
+    if len(tiles) <= 1:
+        log(f'Mesh fits in a single tile (size {tile_size}), cleaning without tiling.')
+        merged = merge_triangles(log, vertices, faces, threshold)
+        return generate_obj_text(vertices, clean_faces(log, vertices, merged))
+
+    stitched = []
+    jobs = (tile_job(vertices, [faces[i] for i in face_ids], threshold) for face_ids in tiles.values())
+    for tile_faces in map_bounded(executor, process_tile, jobs, max_in_flight):
+        stitched.extend(tile_faces)
+
+    groups, final_faces = group_seam_faces(vertices, [faces[i] for i in seam], stitched, tile_size, threshold)
+    shared_groups = [group for group in groups if len(group) > 1]
+    final_faces.extend(group[0] for group in groups if len(group) == 1)
+    jobs = (tile_job(vertices, group, threshold) for group in shared_groups)
+    for group_faces in map_bounded(executor, process_tile, jobs, max_in_flight):
+        final_faces.extend(group_faces)
+
+    logstring = f'Merging and Cleaning in Tiles (size {tile_size}).' + \
+        f'\n    Tiles Processed: {len(tiles)}' + \
+        f'\n    Seam Faces: {len(seam)}' + \
+        f'\n    Seam Groups Processed: {len(shared_groups)} ({sum(len(g) for g in shared_groups)} faces)' + \
+        f'\n    Original Unique Faces: {len(faces)}' + \
+        f'\n    Final Unique Faces: {len(final_faces)}'
+    log(logstring)
+    return generate_obj_text(vertices, final_faces)
+
 def combine_meshes(log, obj_texts, snap_enabled=False, snap_size=0.0625):
     all_faces = []
 
@@ -1,8 +1,9 @@
 import os
 import re
-from modules.mesh_tools import merge_coplanar_triangles_in_obj, clean_mesh, combine_meshes
+from concurrent.futures import ProcessPoolExecutor
+from modules.mesh_tools import merge_coplanar_triangles_in_obj, clean_mesh, combine_meshes, merge_and_clean_tiled
 from modules.obj_utils import generate_obj_text
-from modules.file_manager import write_obj
+from modules.file_manager import write_obj, hash_file
 
 def extract_dmx_values(path):
     with open(path, 'r', encoding='utf-8') as f:
@@ -73,56 +74,88 @@ def extract_dmx_paths_from_vmdl(vmdl_path):
     physics = [os.path.basename(dmx) for dmx in re.findall(r'PhysicsHullFile".*?filename\s*=\s*"([^"]+\.dmx)"', content, re.DOTALL)]
     return render, physics
 
-async def construct_objs_from_vmdls(callback, log, vmdl_paths, base_dir, output_path, merge_threshold=1, use_physics=False, use_render=False, combine_physics_and_render=True, snap_enabled=False, snap_size=0.0625):
-    for path in vmdl_paths:
-        construct_obj_from_vmdl(log, path, base_dir, output_path, merge_threshold, use_physics, use_render, combine_physics_and_render, snap_enabled, snap_size)
+def new_mesh_cache():
+    # Run-wide cache: 'dmx' maps DMX content hash -> obj text,
+    # 'mesh' maps a tuple of DMX hashes -> combined, merged and cleaned obj text
+    return {'dmx': {}, 'mesh': {}}
+
+def load_dmx_obj_text(log, path, mesh_cache, kind):
+    digest = hash_file(path)
+    if digest in mesh_cache['dmx']:
+        log(f'Reusing cached obj for {kind} dmx file: {os.path.basename(path)}')
+        return digest, mesh_cache['dmx'][digest]
+
+    vertices, faces = extract_dmx_values(path)
+    vertex_positions = vertices["position"]
+    log(f'Generating obj for {kind} dmx file: {os.path.basename(path)}')
+    obj_text = generate_obj_text(vertex_positions, faces)
+    mesh_cache['dmx'][digest] = obj_text
+    return digest, obj_text
+
+def build_cleaned_obj(log, dmx_objs, mesh_cache, merge_threshold, snap_enabled, snap_size, tile_enabled=False, tile_size=1024.0, executor=None):
+    key = tuple(digest for digest, _ in dmx_objs)
+    if key in mesh_cache['mesh']:
+        log(f'Reusing cached mesh built from {len(key)} dmx file(s).')
+        return mesh_cache['mesh'][key]
+
+    combined = combine_meshes(log, [obj_text for _, obj_text in dmx_objs], snap_enabled, snap_size)
+    if tile_enabled:
+        # Tiled meshes are the huge one-off ones, keeping them cached for the whole run costs too much memory
+        return merge_and_clean_tiled(log, combined, merge_threshold, tile_size, executor)
+
+    merged_mesh = merge_coplanar_triangles_in_obj(log, combined, merge_threshold)
+    cleaned = clean_mesh(log, merged_mesh)
+    mesh_cache['mesh'][key] = cleaned
+    return cleaned
+
+async def construct_objs_from_vmdls(callback, log, vmdl_paths, base_dir, output_path, merge_threshold=1, use_physics=False, use_render=False, combine_physics_and_render=True, snap_enabled=False, snap_size=0.0625, tile_enabled=False, tile_size=1024.0, output_names=None):
+    # Export options are fixed for the whole run, so meshes can be shared between models
+    mesh_cache = new_mesh_cache()
+    # One worker pool for the whole run, spawning a pool per mesh re-imports numpy/shapely every time
+    executor = ProcessPoolExecutor() if tile_enabled else None
+    try:
+        for path in vmdl_paths:
+            staged_name = os.path.basename(path).split('.')[0]
+            output_name = output_names.get(staged_name) if output_names else None
+            construct_obj_from_vmdl(log, path, base_dir, output_path, merge_threshold, use_physics, use_render, combine_physics_and_render, snap_enabled, snap_size, tile_enabled, tile_size, mesh_cache, executor, output_name)
+    finally:
+        if executor:
+            executor.shutdown()
         
     callback(base_dir)
 
-def construct_obj_from_vmdl(log, vmdl_path, base_dir, output_path, merge_threshold=1, use_physics=False, use_render=False, combine_physics_and_render=True, snap_enabled=False, snap_size=0.0625):
-    basename = os.path.basename(vmdl_path).split('.')[0]
+def construct_obj_from_vmdl(log, vmdl_path, base_dir, output_path, merge_threshold=1, use_physics=False, use_render=False, combine_physics_and_render=True, snap_enabled=False, snap_size=0.0625, tile_enabled=False, tile_size=1024.0, mesh_cache=None, executor=None, output_name=None):
+    if mesh_cache is None:
+        mesh_cache = new_mesh_cache()
+    basename = output_name or os.path.basename(vmdl_path).split('.')[0]
     render_list, physics_list = extract_dmx_paths_from_vmdl(vmdl_path)
 
-    render_obj_texts = []
+    render_objs = []
     if use_render or combine_physics_and_render:
         for path in render_list:
             full_path = os.path.join(base_dir, path)
-            vertices, faces = extract_dmx_values(full_path)
-            all_vertex_formats = [ "position", "texcoord", "normal", "tangent" ]
-            vertex_positions = vertices["position"]
-            log(f'Generating obj for render dmx file: {path}')
-            render_obj_texts.append(generate_obj_text(vertex_positions, faces))
+            render_objs.append(load_dmx_obj_text(log, full_path, mesh_cache, 'render'))
 
-    physics_obj_texts = []
+    physics_objs = []
     if use_physics or combine_physics_and_render:
         for path in physics_list:
             full_path = os.path.join(base_dir, path)
-            vertices, faces = extract_dmx_values(full_path)
-            all_vertex_formats = [ "position", "texcoord", "normal", "tangent" ]
-            vertex_positions = vertices["position"]
-            log(f'Generating obj for physics dmx file: {path}')
-            physics_obj_texts.append(generate_obj_text(vertex_positions, faces))
+            physics_objs.append(load_dmx_obj_text(log, full_path, mesh_cache, 'physics'))
     
     
-    if use_render and len(render_obj_texts) > 0:
-        combined = combine_meshes(log, render_obj_texts, snap_enabled, snap_size)
-        merged_mesh = merge_coplanar_triangles_in_obj(log, combined, merge_threshold)
-        cleaned = clean_mesh(log, merged_mesh)
+    if use_render and len(render_objs) > 0:
+        cleaned = build_cleaned_obj(log, render_objs, mesh_cache, merge_threshold, snap_enabled, snap_size, tile_enabled, tile_size, executor)
         write_obj(log, cleaned, output_path, basename, '.render')
     elif use_render:
         log(f'No render DMX paths found for vmdl: {basename}')
         
-    if use_physics and len(physics_obj_texts) > 0:
-        combined = combine_meshes(log, physics_obj_texts, snap_enabled, snap_size)
-        mergedmerged_mesh_triangles = merge_coplanar_triangles_in_obj(log, combined, merge_threshold)
-        cleaned = clean_mesh(log, merged_mesh)
+    if use_physics and len(physics_objs) > 0:
+        cleaned = build_cleaned_obj(log, physics_objs, mesh_cache, merge_threshold, snap_enabled, snap_size, tile_enabled, tile_size, executor)
         write_obj(log, cleaned, output_path, basename, '.physics')
     elif use_physics:
         log(f'No physics DMX paths found for vmdl: {basename}')
         
-    if combine_physics_and_render and (len(render_obj_texts) > 0 or len(physics_obj_texts) > 0):
-        all_objs = physics_obj_texts + render_obj_texts
-        combined = combine_meshes(log, all_objs, snap_enabled, snap_size)
-        merged_mesh = merge_coplanar_triangles_in_obj(log, combined, merge_threshold)
-        cleaned = clean_mesh(log, merged_mesh)
+    if combine_physics_and_render and (len(render_objs) > 0 or len(physics_objs) > 0):
+        all_objs = physics_objs + render_objs
+        cleaned = build_cleaned_obj(log, all_objs, mesh_cache, merge_threshold, snap_enabled, snap_size, tile_enabled, tile_size, executor)
         write_obj(log, cleaned, output_path, basename, '.combined')
\ No newline at end of file
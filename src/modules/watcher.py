@@ -0,0 +1,39 @@
+import os
+import time
+from modules.file_manager import extract_vmdlc_from_dir
+
+def snapshot_vmdlcs(addon_dir):
+    mtimes = {}
+    # Scanned every poll, so don't log each file found
+    for path in extract_vmdlc_from_dir(lambda _: None, addon_dir):
+        try:
+            mtimes[path] = os.path.getmtime(path)
+        except OSError:
+            continue  # Removed between the scan and the stat
+    return mtimes
+
+def changed_vmdlcs(old_snapshot, new_snapshot):
+    return [path for path, mtime in new_snapshot.items() if old_snapshot.get(path) != mtime]
+
+def watch_vmdlcs(log, addon_dir, on_changes, stop_event, poll_interval=1.0, debounce=2.0):
+    # Polls mtimes rather than using inotify, which isn't available on Windows where this tool runs.
+    # Changes are collected until the addon has been quiet for `debounce` seconds,
+    # so a compile that rewrites a file several times only triggers a single export.
+    log(f'Watching for recompiled models in: {addon_dir}')
+    known = snapshot_vmdlcs(addon_dir)
+    pending = set()
+    last_change = 0.0
+
+    while not stop_event.wait(poll_interval):
+        current = snapshot_vmdlcs(addon_dir)
+        changed = changed_vmdlcs(known, current)
+        known = current
+        if changed:
+            pending.update(changed)
+            last_change = time.monotonic()
+        elif pending and time.monotonic() - last_change >= debounce:
+            log(f'Detected {len(pending)} recompiled model(s).')
+            on_changes(sorted(pending))
+            pending = set()
+
+    log(f'Stopped watching: {addon_dir}')